@@ -1,20 +1,53 @@
 import asyncio
+import functools
+import hmac
+import logging
 import os
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from livekit import api, rtc
-from livekit.agents import Agent, AgentSession
+from livekit.agents import Agent, AgentSession, function_tool, llm
 from livekit.plugins import google
 from livekit.protocol.room import RoomConfiguration
 from pydantic import BaseModel
 
+from backend.deal_board import DealBoard, Offer
+from backend.diagnostics import LoopLagMonitor, format_collapsed, sample_stacks
+
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_MONITOR = LoopLagMonitor(
+    threshold=float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100")) / 1000
+)
+MAX_PROFILE_SECONDS = 60.0
+# One profile at a time, on its own thread, so profiling can't tie up the
+# loop's default executor (shared with getaddrinfo and other to_thread work).
+PROFILE_LOCK = asyncio.Lock()
+PROFILE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profiler")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    LOOP_LAG_MONITOR.start()
+    try:
+        yield
+    finally:
+        await LOOP_LAG_MONITOR.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -65,23 +98,122 @@ AGENT_CONFIGS = {
         ),
     },
 }
+DEAL_BOARD_INSTRUCTIONS = (
+    "You share a deal board with the other sharks in this room. It appears "
+    "below and again whenever it changes; the snapshot with the highest version "
+    "is current. Treat it as settled fact and do not ask the entrepreneur again "
+    "for anything already on it. When the entrepreneur states or corrects their "
+    "company, ask, equity or revenue, call update_deal_board. Call make_offer "
+    "when you make or revise an offer and withdraw_offer when you are out."
+)
+DEAL_BOARD_UPDATE_PREFIX = "[Shared deal board update, not said by the entrepreneur]"
 AGENT_JOIN_LOCK = asyncio.Lock()
 
+# Reconnect policy for shark rooms. The first attempt is immediate so a
+# transient blip resumes in well under a second; later attempts back off
+# exponentially with full jitter so sharks sharing a server don't retry in
+# lockstep.
+RECONNECT_MAX_ATTEMPTS = 6
+RECONNECT_BASE_DELAY = 0.2
+RECONNECT_MAX_DELAY = 5.0
+NON_RECOVERABLE_DISCONNECT_REASONS = {
+    rtc.DisconnectReason.CLIENT_INITIATED,
+    rtc.DisconnectReason.DUPLICATE_IDENTITY,
+    rtc.DisconnectReason.PARTICIPANT_REMOVED,
+    rtc.DisconnectReason.ROOM_DELETED,
+    rtc.DisconnectReason.ROOM_CLOSED,
+}
+
+
+@dataclass
+class ReconnectMetrics:
+    """Reconnect counters for one shark.
+
+    ``attempts`` and ``failed_attempts`` count single connect-and-start tries;
+    ``successes`` and ``failed_cycles`` count whole reconnect cycles. Timings
+    cover a successful cycle from the moment the drop was handled to the
+    resumed session, including closing the old session and any backoff.
+    """
+
+    attempts: int = 0
+    failed_attempts: int = 0
+    successes: int = 0
+    failed_cycles: int = 0
+    last_seconds: Optional[float] = None
+    max_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    def record(self, seconds: float, *, succeeded: bool) -> None:
+        if succeeded:
+            self.successes += 1
+            self.last_seconds = seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.total_seconds += seconds
+        else:
+            self.failed_cycles += 1
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "attempts": self.attempts,
+            "failed_attempts": self.failed_attempts,
+            "successes": self.successes,
+            "failed_cycles": self.failed_cycles,
+            "timing": "disconnect handled -> session resumed, incl. close and backoff",
+            "last_seconds": self.last_seconds,
+            "max_seconds": self.max_seconds,
+            "avg_seconds": (
+                self.total_seconds / self.successes if self.successes else None
+            ),
+        }
+
 
 @dataclass
 class ManagedAgentConnection:
     room: rtc.Room
     session: AgentSession
+    room_name: str
+    agent_name: str
+    instructions: str
+    ws_url: str
+    token_factory: Callable[[], str]
+    deal_board: DealBoard
+    reconnect_task: Optional[asyncio.Task] = None
+    metrics: ReconnectMetrics = field(default_factory=ReconnectMetrics)
 
 
 ACTIVE_AGENT_CONNECTIONS: Dict[Tuple[str, str], ManagedAgentConnection] = {}
+DEAL_BOARDS: Dict[str, DealBoard] = {}
+
+
+def _build_shark_instructions(instructions: str, deal_board: DealBoard) -> str:
+    return f"{instructions}\n\n{DEAL_BOARD_INSTRUCTIONS}\n\n{deal_board.snapshot()}"
 
 
 class SharkAgent(Agent):
-    def __init__(self, instructions: str):
-        super().__init__(instructions=instructions)
+    def __init__(
+        self,
+        agent_name: str,
+        instructions: str,
+        deal_board: DealBoard,
+        chat_ctx: Optional[llm.ChatContext] = None,
+    ):
+        super().__init__(
+            instructions=_build_shark_instructions(instructions, deal_board),
+            chat_ctx=chat_ctx,
+        )
+        self._agent_name = agent_name
+        self._deal_board = deal_board
+        self._board_version = deal_board.version
+        # A shark carrying over chat context is resuming a pitch after a
+        # reconnect and must not re-introduce itself.
+        self._resuming = chat_ctx is not None
 
     async def on_enter(self) -> None:
+        self._deal_board.subscribe(self._on_deal_board_updated)
+        # The board may have moved on while this shark was joining.
+        await self._on_deal_board_updated(self._deal_board)
+        if self._resuming:
+            return
         await self.session.generate_reply(
             instructions=(
                 "Introduce yourself as this shark and ask the entrepreneur "
@@ -89,6 +221,95 @@ class SharkAgent(Agent):
             )
         )
 
+    async def on_exit(self) -> None:
+        self._deal_board.unsubscribe(self._on_deal_board_updated)
+
+    async def _on_deal_board_updated(self, deal_board: DealBoard) -> None:
+        version = deal_board.version
+        if version <= self._board_version:
+            return
+        # Gemini Live context is append-only: it cannot drop earlier items, so
+        # every change adds one compact snapshot to this shark's context. That
+        # is still far smaller than update_instructions, which resends the
+        # whole persona prompt. The snapshot goes in as a user-side note so the
+        # shark doesn't read the board as words it said itself.
+        rt_session = self.realtime_llm_session
+        chat_ctx = rt_session.chat_ctx
+        chat_ctx.add_message(
+            role="user",
+            content=f"{DEAL_BOARD_UPDATE_PREFIX}\n{deal_board.snapshot()}",
+        )
+        await rt_session.update_chat_ctx(chat_ctx)
+        # Only count the shark as up to date once the update went through, so
+        # a failed send is retried on the next change.
+        self._board_version = max(self._board_version, version)
+
+    def _record_board_change(self, changed: bool) -> str:
+        if not changed:
+            return "The deal board already shows that."
+        # Other sharks are updated in the background so this tool call isn't
+        # held up by the slowest realtime session in the room.
+        self._deal_board.notify()
+        return "Deal board updated."
+
+    @function_tool
+    async def update_deal_board(
+        self,
+        company: Optional[str] = None,
+        ask_amount: Optional[float] = None,
+        equity_percent: Optional[float] = None,
+        revenue: Optional[float] = None,
+    ) -> str:
+        """Record pitch facts the entrepreneur stated on the shared deal board.
+
+        Args:
+            company: Name of the entrepreneur's company.
+            ask_amount: Investment the entrepreneur is asking for, in dollars.
+            equity_percent: Equity offered for the ask, in percent.
+            revenue: Annual revenue to date, in dollars.
+        """
+        return self._record_board_change(
+            self._deal_board.update_pitch(
+                company=company,
+                ask_amount=ask_amount,
+                equity_percent=equity_percent,
+                revenue=revenue,
+            )
+        )
+
+    @function_tool
+    async def make_offer(
+        self,
+        amount: float,
+        equity_percent: float,
+        royalty_percent: Optional[float] = None,
+        conditions: Optional[str] = None,
+    ) -> str:
+        """Put your offer on the shared deal board, replacing any earlier one.
+
+        Args:
+            amount: Amount you are offering to invest, in dollars.
+            equity_percent: Equity you want in return, in percent.
+            royalty_percent: Royalty you want on each unit sold, in percent.
+            conditions: Any other strings attached to the offer.
+        """
+        offer = Offer(
+            amount=amount,
+            equity_percent=equity_percent,
+            royalty_percent=royalty_percent,
+            conditions=conditions,
+        )
+        return self._record_board_change(
+            self._deal_board.set_offer(self._agent_name, offer)
+        )
+
+    @function_tool
+    async def withdraw_offer(self) -> str:
+        """Remove your offer from the shared deal board because you are out."""
+        return self._record_board_change(
+            self._deal_board.withdraw_offer(self._agent_name)
+        )
+
 
 def _get_livekit_credentials() -> Tuple[str, str, str]:
     api_key = os.getenv("LIVEKIT_API_KEY")
@@ -101,6 +322,17 @@ def _get_livekit_credentials() -> Tuple[str, str, str]:
     return api_key, api_secret, server_url
 
 
+def _require_debug_token(authorization: Optional[str] = Header(None)) -> None:
+    expected = os.getenv("DEBUG_API_TOKEN")
+    if not expected:
+        # Debug endpoints are disabled unless a token is configured.
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not authorization or not hmac.compare_digest(
+        authorization.encode(), f"Bearer {expected}".encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid debug token")
+
+
 def _normalize_ws_url(url: str) -> str:
     if url.startswith("https://"):
         return "wss://" + url[len("https://") :]
@@ -198,6 +430,142 @@ def _build_agent_token(
     )
 
 
+def _reconnect_delay(attempt: int) -> float:
+    if attempt == 0:
+        return 0.0
+    ceiling = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+def _watch_agent_room(connection: ManagedAgentConnection) -> None:
+    def on_disconnected(reason: rtc.DisconnectReason.ValueType) -> None:
+        if connection.room is not room:
+            return
+        # While a reconnect is running it owns the room: it checks the
+        # connection itself and tears down failed attempts on purpose.
+        if connection.reconnect_task and not connection.reconnect_task.done():
+            return
+        if reason in NON_RECOVERABLE_DISCONNECT_REASONS:
+            logger.info(
+                "%s left room %s (%s); not reconnecting",
+                connection.agent_name,
+                room.name,
+                rtc.DisconnectReason.Name(reason),
+            )
+            _forget_connection(connection)
+            return
+        _schedule_reconnect(connection)
+
+    room = connection.room
+    room.on("disconnected", on_disconnected)
+
+
+def _forget_connection(connection: ManagedAgentConnection) -> None:
+    key = (connection.room_name, connection.agent_name)
+    if ACTIVE_AGENT_CONNECTIONS.get(key) is connection:
+        del ACTIVE_AGENT_CONNECTIONS[key]
+    # The board only describes the current pitch; once no shark is left in the
+    # room there is nobody to keep it accurate.
+    if DEAL_BOARDS.get(connection.room_name) is connection.deal_board and not any(
+        room_name == connection.room_name for room_name, _ in ACTIVE_AGENT_CONNECTIONS
+    ):
+        del DEAL_BOARDS[connection.room_name]
+
+
+async def _reset_room(room_name: str) -> None:
+    """Drop sharks and the deal board left over from an earlier room of this name."""
+    DEAL_BOARDS.pop(room_name, None)
+    for key in [key for key in ACTIVE_AGENT_CONNECTIONS if key[0] == room_name]:
+        connection = ACTIVE_AGENT_CONNECTIONS.pop(key)
+        if connection.reconnect_task and not connection.reconnect_task.done():
+            connection.reconnect_task.cancel()
+        try:
+            await connection.session.aclose()
+            await connection.room.disconnect()
+        except Exception as e:
+            logger.warning("Closing stale %s failed: %s", connection.agent_name, e)
+
+
+def _schedule_reconnect(connection: ManagedAgentConnection) -> asyncio.Task:
+    task = connection.reconnect_task
+    if task is None or task.done():
+        task = asyncio.create_task(_reconnect_agent(connection))
+        connection.reconnect_task = task
+    return task
+
+
+async def _reconnect_agent(connection: ManagedAgentConnection) -> bool:
+    """Reconnect a shark's room and resume its existing ``AgentSession``.
+
+    The session keeps its chat history across ``aclose()``/``start()``, so the
+    shark picks the pitch back up instead of starting over.
+    """
+    started_at = time.perf_counter()
+    try:
+        await connection.session.aclose()
+    except Exception as e:
+        logger.warning("Closing %s session failed: %s", connection.agent_name, e)
+
+    for attempt in range(RECONNECT_MAX_ATTEMPTS):
+        await asyncio.sleep(_reconnect_delay(attempt))
+        connection.metrics.attempts += 1
+        room = rtc.Room()
+        connection.room = room
+        _watch_agent_room(connection)
+        try:
+            await room.connect(connection.ws_url, connection.token_factory())
+            await connection.session.start(
+                room=room,
+                agent=SharkAgent(
+                    connection.agent_name,
+                    connection.instructions,
+                    connection.deal_board,
+                    chat_ctx=connection.session.history.copy(),
+                ),
+            )
+            if not room.isconnected():
+                raise RuntimeError("room dropped while the session was starting")
+        except Exception as e:
+            connection.metrics.failed_attempts += 1
+            logger.warning(
+                "Reconnect attempt %d for %s failed: %s",
+                attempt + 1,
+                connection.agent_name,
+                e,
+            )
+            # start() may have got as far as creating its RoomIO, so close the
+            # session as well as the room before trying again.
+            for cleanup in (connection.session.aclose, room.disconnect):
+                try:
+                    await cleanup()
+                except Exception as e:
+                    logger.warning(
+                        "Cleaning up %s attempt failed: %s", connection.agent_name, e
+                    )
+            continue
+
+        elapsed = time.perf_counter() - started_at
+        connection.metrics.record(elapsed, succeeded=True)
+        logger.info(
+            "%s resumed in room %s after %.3fs",
+            connection.agent_name,
+            room.name,
+            elapsed,
+        )
+        return True
+
+    connection.metrics.record(time.perf_counter() - started_at, succeeded=False)
+    # Forget the dead connection so the next /session-token cold-starts the
+    # shark instead of running another full retry cycle first.
+    _forget_connection(connection)
+    logger.error(
+        "%s could not reconnect after %d attempts",
+        connection.agent_name,
+        RECONNECT_MAX_ATTEMPTS,
+    )
+    return False
+
+
 async def _join_agents_manually(
     *,
     server_url: str,
@@ -205,6 +573,7 @@ async def _join_agents_manually(
     api_secret: str,
     room_name: str,
     agent_names: List[str],
+    room_created: bool = False,
 ) -> List[str]:
     google_api_key = os.getenv("GOOGLE_API_KEY")
     if not google_api_key:
@@ -213,31 +582,50 @@ async def _join_agents_manually(
     ws_url = _normalize_ws_url(server_url)
     connected_agents: List[str] = []
 
+    for agent_name in agent_names:
+        if agent_name not in AGENT_CONFIGS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported agent name: {agent_name}",
+            )
+
+    # Resume dropped sharks outside the join lock: a full retry cycle can take
+    # several seconds and must not hold up /session-token for other rooms.
+    resuming = []
     async with AGENT_JOIN_LOCK:
+        if room_created:
+            # A new room reusing an old name is a new pitch.
+            await _reset_room(room_name)
         for agent_name in agent_names:
-            config = AGENT_CONFIGS.get(agent_name)
-            if not config:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Unsupported agent name: {agent_name}",
-                )
+            existing = ACTIVE_AGENT_CONNECTIONS.get((room_name, agent_name))
+            if existing and not existing.room.isconnected():
+                resuming.append(asyncio.shield(_schedule_reconnect(existing)))
+    if resuming:
+        await asyncio.gather(*resuming)
 
+    async with AGENT_JOIN_LOCK:
+        deal_board = DEAL_BOARDS.setdefault(room_name, DealBoard(room_name=room_name))
+        for agent_name in agent_names:
+            config = AGENT_CONFIGS[agent_name]
             key = (room_name, agent_name)
             existing = ACTIVE_AGENT_CONNECTIONS.get(key)
-            if existing and existing.room.isconnected():
+            if existing and (
+                existing.room.isconnected()
+                or (existing.reconnect_task and not existing.reconnect_task.done())
+            ):
                 connected_agents.append(agent_name)
                 continue
 
-            room = rtc.Room()
-            await room.connect(
-                ws_url,
-                _build_agent_token(
+            def token_factory(agent_name: str = agent_name) -> str:
+                return _build_agent_token(
                     api_key=api_key,
                     api_secret=api_secret,
                     room_name=room_name,
                     agent_name=agent_name,
-                ),
-            )
+                )
+
+            room = rtc.Room()
+            await room.connect(ws_url, token_factory())
 
             session = AgentSession(
                 llm=google.realtime.RealtimeModel(
@@ -247,11 +635,23 @@ async def _join_agents_manually(
                     instructions=config["instructions"],
                 )
             )
-            await session.start(room=room, agent=SharkAgent(config["instructions"]))
+            await session.start(
+                room=room,
+                agent=SharkAgent(agent_name, config["instructions"], deal_board),
+            )
 
-            ACTIVE_AGENT_CONNECTIONS[key] = ManagedAgentConnection(
-                room=room, session=session
+            connection = ManagedAgentConnection(
+                room=room,
+                session=session,
+                room_name=room_name,
+                agent_name=agent_name,
+                instructions=config["instructions"],
+                ws_url=ws_url,
+                token_factory=token_factory,
+                deal_board=deal_board,
             )
+            _watch_agent_room(connection)
+            ACTIVE_AGENT_CONNECTIONS[key] = connection
             connected_agents.append(agent_name)
 
     return sorted(connected_agents)
@@ -306,6 +706,7 @@ async def get_session_token(request: SessionTokenRequest):
             api_secret=api_secret,
             room_name=room_name,
             agent_names=requested_agents,
+            room_created=room_created,
         )
 
         participant_token = _build_participant_token(
@@ -331,6 +732,70 @@ async def get_session_token(request: SessionTokenRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/agent-connections", dependencies=[Depends(_require_debug_token)])
+async def get_agent_connections():
+    return {
+        "connections": [
+            {
+                "room_name": room_name,
+                "agent_name": agent_name,
+                "connected": connection.room.isconnected(),
+                "reconnecting": bool(
+                    connection.reconnect_task and not connection.reconnect_task.done()
+                ),
+                "reconnects": connection.metrics.as_dict(),
+            }
+            for (room_name, agent_name), connection in ACTIVE_AGENT_CONNECTIONS.items()
+        ]
+    }
+
+
+@app.get("/debug/loop-lag", dependencies=[Depends(_require_debug_token)])
+async def get_loop_lag():
+    return LOOP_LAG_MONITOR.snapshot()
+
+
+@app.get(
+    "/debug/profile",
+    dependencies=[Depends(_require_debug_token)],
+    response_class=PlainTextResponse,
+)
+async def get_profile(
+    seconds: float = Query(5.0, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    all_threads: bool = False,
+):
+    if PROFILE_LOCK.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with PROFILE_LOCK:
+        # This handler runs on the event loop thread, which is the one we want
+        # to sample; the sampler runs on the profiler thread so the loop stays
+        # free.
+        thread_ids = None if all_threads else [threading.get_ident()]
+        stacks = await asyncio.get_running_loop().run_in_executor(
+            PROFILE_EXECUTOR,
+            functools.partial(
+                sample_stacks,
+                seconds,
+                interval=interval_ms / 1000,
+                thread_ids=thread_ids,
+            ),
+        )
+    return format_collapsed(stacks)
+
+
+@app.get("/deal-board/{room_name}", dependencies=[Depends(_require_debug_token)])
+async def get_deal_board(room_name: str):
+    deal_board = DEAL_BOARDS.get(room_name)
+    if deal_board is None:
+        raise HTTPException(status_code=404, detail="No deal board for room")
+    return {
+        "room_name": room_name,
+        "version": deal_board.version,
+        "snapshot": deal_board.snapshot(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DealBoardListener = Callable[["DealBoard"], Awaitable[None]]
+
+
+@dataclass
+class Offer:
+    amount: float
+    equity_percent: float
+    royalty_percent: Optional[float] = None
+    conditions: Optional[str] = None
+
+    def render(self) -> str:
+        text = f"{_money(self.amount)} for {self.equity_percent:g}%"
+        if self.royalty_percent:
+            text += f" + {self.royalty_percent:g}% royalty"
+        if self.conditions:
+            text += f" ({self.conditions})"
+        return text
+
+
+@dataclass
+class DealBoard:
+    """Pitch facts and shark offers shared by every shark in one room.
+
+    Sharks write to the board through tool calls and read it back as a short
+    snapshot in their context, so each fact is extracted from the audio once
+    instead of once per shark. The snapshot is rendered lazily and cached
+    until the next update.
+    """
+
+    room_name: str
+    company: Optional[str] = None
+    ask_amount: Optional[float] = None
+    equity_percent: Optional[float] = None
+    revenue: Optional[float] = None
+    offers: Dict[str, Offer] = field(default_factory=dict)
+    version: int = 0
+    _listeners: List[DealBoardListener] = field(default_factory=list, repr=False)
+    _snapshot: Optional[str] = field(default=None, repr=False)
+    _publish_tasks: Set[asyncio.Task] = field(default_factory=set, repr=False)
+
+    @property
+    def valuation(self) -> Optional[float]:
+        if not self.ask_amount or not self.equity_percent:
+            return None
+        return self.ask_amount / (self.equity_percent / 100)
+
+    def update_pitch(
+        self,
+        *,
+        company: Optional[str] = None,
+        ask_amount: Optional[float] = None,
+        equity_percent: Optional[float] = None,
+        revenue: Optional[float] = None,
+    ) -> bool:
+        changes = {
+            "company": company,
+            "ask_amount": ask_amount,
+            "equity_percent": equity_percent,
+            "revenue": revenue,
+        }
+        changed = False
+        for name, value in changes.items():
+            if value is not None and getattr(self, name) != value:
+                setattr(self, name, value)
+                changed = True
+        if changed:
+            self._bump()
+        return changed
+
+    def set_offer(self, shark: str, offer: Offer) -> bool:
+        if self.offers.get(shark) == offer:
+            return False
+        self.offers[shark] = offer
+        self._bump()
+        return True
+
+    def withdraw_offer(self, shark: str) -> bool:
+        if self.offers.pop(shark, None) is None:
+            return False
+        self._bump()
+        return True
+
+    def snapshot(self) -> str:
+        if self._snapshot is None:
+            self._snapshot = self._render()
+        return self._snapshot
+
+    def subscribe(self, listener: DealBoardListener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: DealBoardListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def publish(self) -> None:
+        results = await asyncio.gather(
+            *(listener(self) for listener in list(self._listeners)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Deal board listener failed: %s", result)
+
+    def notify(self) -> None:
+        """Publish in the background so the caller isn't held up by listeners."""
+        task = asyncio.create_task(self.publish())
+        self._publish_tasks.add(task)
+        task.add_done_callback(self._publish_tasks.discard)
+
+    def _bump(self) -> None:
+        self.version += 1
+        self._snapshot = None
+
+    def _render(self) -> str:
+        ask = "unknown"
+        if self.ask_amount is not None:
+            ask = _money(self.ask_amount)
+            if self.equity_percent is not None:
+                ask += f" for {self.equity_percent:g}%"
+            if self.valuation is not None:
+                ask += f" (valuation {_money(self.valuation)})"
+        revenue = _money(self.revenue) if self.revenue is not None else "unknown"
+        offers = "; ".join(
+            f"{shark}: {offer.render()}" for shark, offer in sorted(self.offers.items())
+        )
+        return "\n".join(
+            [
+                f"DEAL BOARD v{self.version}",
+                f"Company: {self.company or 'unknown'}",
+                f"Ask: {ask}",
+                f"Revenue: {revenue}",
+                f"Offers: {offers or 'none'}",
+            ]
+        )
+
+
+def _money(amount: float) -> str:
+    return f"${amount:,.0f}"
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (in milliseconds) of the loop-lag histogram buckets.
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up and catch what blocks it.
+
+    A ticker coroutine sleeps for ``interval`` seconds and records how much
+    longer than that it actually took into a histogram. Because a blocked loop
+    cannot run the ticker, a watchdog thread also watches its heartbeat and
+    logs the loop thread's stack while the stall is still in progress.
+    """
+
+    def __init__(self, *, interval: float = 0.05, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.bucket_counts = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.stalls = 0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def record(self, lag: float) -> None:
+        lag_ms = lag * 1000
+        for index, bound in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                break
+        else:
+            index = len(LAG_BUCKETS_MS)
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.total_seconds += lag
+        self.max_seconds = max(self.max_seconds, lag)
+
+    def snapshot(self) -> Dict[str, object]:
+        buckets = {
+            f"le_{bound}ms": n for bound, n in zip(LAG_BUCKETS_MS, self.bucket_counts)
+        }
+        buckets["inf"] = self.bucket_counts[-1]
+        return {
+            "interval_seconds": self.interval,
+            "threshold_seconds": self.threshold,
+            "count": self.count,
+            "avg_seconds": self.total_seconds / self.count if self.count else None,
+            "max_seconds": self.max_seconds,
+            "stalls": self.stalls,
+            "buckets": buckets,
+        }
+
+    async def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._heartbeat = time.monotonic()
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            logger.warning(
+                "Event loop blocked for %.0fms; loop thread stack:\n%s",
+                stalled_for * 1000,
+                stack,
+            )
+
+
+def _collapse_frame(frame) -> List[str]:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        )
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def sample_stacks(
+    seconds: float,
+    *,
+    interval: float = 0.005,
+    thread_ids: Optional[List[int]] = None,
+) -> Counter:
+    """Sample thread stacks for ``seconds`` and count identical stacks.
+
+    Runs on the calling thread, so call it from a worker thread to profile the
+    event loop. Only the threads in ``thread_ids`` are sampled; by default
+    every thread except the sampler itself.
+    """
+    sampler_id = threading.get_ident()
+    thread_names = {t.ident: t.name for t in threading.enumerate()}
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler_id:
+                continue
+            if thread_ids is not None and thread_id not in thread_ids:
+                continue
+            thread_name = thread_names.get(thread_id, str(thread_id))
+            stacks[";".join([thread_name, *_collapse_frame(frame)])] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """Render stack counts in the collapsed format read by flamegraph tools."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
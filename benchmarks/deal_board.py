@@ -0,0 +1,142 @@
+"""Measure deal board update and read costs.
+
+Publishing goes through real ``SharkAgent._on_deal_board_updated`` listeners
+backed by a stub realtime session. The stub is append-only like Gemini Live,
+so the growth table shows the context each shark really accumulates.
+
+Run with ``uv run python -m benchmarks.deal_board``.
+"""
+
+import asyncio
+import timeit
+
+from livekit.agents import llm
+
+from backend.api import SharkAgent, _build_shark_instructions
+from backend.deal_board import DealBoard, Offer
+
+SHARKS = ["Mark", "Kevin", "Lori"]
+NUMBER = 100_000
+PUBLISH_NUMBER = 2_000
+GROWTH_CHECKPOINTS = (1, 10, 100, 1_000)
+
+
+class StubRealtimeSession:
+    """Append-only like Gemini Live: sent items stay in the server context."""
+
+    def __init__(self) -> None:
+        self.known = llm.ChatContext.empty()
+        self.server_items = 0
+        self.server_chars = 0
+
+    @property
+    def chat_ctx(self) -> llm.ChatContext:
+        return self.known.copy()
+
+    async def update_chat_ctx(self, chat_ctx: llm.ChatContext) -> None:
+        known_ids = {item.id for item in self.known.items}
+        for item in chat_ctx.items:
+            if item.id not in known_ids:
+                self.server_items += 1
+                self.server_chars += len(item.text_content or "")
+        self.known = chat_ctx
+
+
+class BenchShark(SharkAgent):
+    def __init__(self, name: str, board: DealBoard) -> None:
+        super().__init__(name, f"You are {name}.", board)
+        self.stub_session = StubRealtimeSession()
+
+    @property
+    def realtime_llm_session(self) -> StubRealtimeSession:
+        return self.stub_session
+
+
+def _filled_board() -> DealBoard:
+    board = DealBoard(room_name="bench")
+    board.update_pitch(
+        company="Acme", ask_amount=500_000, equity_percent=10, revenue=1_200_000
+    )
+    for index, shark in enumerate(SHARKS):
+        board.set_offer(shark, Offer(500_000, 15 + index, royalty_percent=5))
+    return board
+
+
+def _report(name: str, seconds: float, number: int = NUMBER) -> None:
+    print(f"{name:<40} {seconds / number * 1e6:8.2f} us/op")
+
+
+def _bench_local(board: DealBoard) -> None:
+    _report("snapshot (cached)", timeit.timeit(board.snapshot, number=NUMBER))
+
+    def update_and_read():
+        board.update_pitch(revenue=board.revenue + 1)
+        board.snapshot()
+
+    _report("update_pitch + snapshot", timeit.timeit(update_and_read, number=NUMBER))
+
+    counter = iter(range(10**9))
+
+    def offer_and_read():
+        board.set_offer("Kevin", Offer(500_000, next(counter)))
+        board.snapshot()
+
+    _report("set_offer + snapshot", timeit.timeit(offer_and_read, number=NUMBER))
+
+
+async def _publish_updates(board: DealBoard, number: int) -> None:
+    for _ in range(number):
+        board.update_pitch(revenue=board.revenue + 1)
+        await board.publish()
+
+
+def _subscribed_sharks(board: DealBoard) -> list:
+    sharks = [BenchShark(name, board) for name in SHARKS]
+    for shark in sharks:
+        board.subscribe(shark._on_deal_board_updated)
+    return sharks
+
+
+async def _bench_publish() -> None:
+    board = _filled_board()
+    _subscribed_sharks(board)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await _publish_updates(board, PUBLISH_NUMBER)
+    _report(
+        f"update + publish to {len(SHARKS)} sharks",
+        loop.time() - started,
+        PUBLISH_NUMBER,
+    )
+
+    # Context each shark accumulates after N board changes. Gemini Live can't
+    # drop earlier snapshots, so every change stays in the server context.
+    board = _filled_board()
+    shark = _subscribed_sharks(board)[0]
+    full_prompt = len(_build_shark_instructions(f"You are {SHARKS[0]}.", board))
+    print(
+        f"\n{'updates':>8} {'ctx items':>10} {'ctx chars':>10}"
+        f" {'full-prompt resend chars':>25}"
+    )
+    done = 0
+    for checkpoint in GROWTH_CHECKPOINTS:
+        await _publish_updates(board, checkpoint - done)
+        done = checkpoint
+        session = shark.stub_session
+        print(
+            f"{checkpoint:>8} {session.server_items:>10} "
+            f"{session.server_chars:>10} {checkpoint * full_prompt:>25}"
+        )
+    print(
+        f"\nper update: {session.server_chars // done} chars "
+        f"vs {full_prompt} for resending the full prompt"
+    )
+
+
+def main() -> None:
+    _bench_local(_filled_board())
+    asyncio.run(_bench_publish())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import asyncio
+
+from livekit import rtc
+
+from backend import api as backend_api
+
+
+class FakeRoom:
+    fail_connects = 0
+    fail_disconnects = False
+    instances = []
+
+    def __init__(self):
+        self.name = "arena-1"
+        self.connected = False
+        self.handlers = {}
+        FakeRoom.instances.append(self)
+
+    async def connect(self, url, token):
+        if FakeRoom.fail_connects:
+            FakeRoom.fail_connects -= 1
+            raise RuntimeError("connection refused")
+        self.connected = True
+
+    async def disconnect(self):
+        if FakeRoom.fail_disconnects:
+            raise RuntimeError("ffi handle already closed")
+        self.connected = False
+
+    def isconnected(self):
+        return self.connected
+
+    def on(self, event, callback):
+        self.handlers[event] = callback
+
+    def drop(self, reason):
+        self.connected = False
+        self.handlers["disconnected"](reason)
+
+
+class FakeHistory:
+    def __init__(self, items):
+        self.items = items
+
+    def copy(self):
+        return FakeHistory(list(self.items))
+
+
+class FakeSession:
+    def __init__(self):
+        self.history = FakeHistory(["pitch: $500k for 10%"])
+        self.closed = 0
+        self.started_with = []
+        self.fail_starts = 0
+        self.drop_during_start = 0
+
+    async def aclose(self):
+        self.closed += 1
+
+    async def start(self, *, room, agent):
+        self.started_with.append((room, agent))
+        if self.fail_starts:
+            self.fail_starts -= 1
+            raise RuntimeError("realtime model refused the session")
+        if self.drop_during_start:
+            self.drop_during_start -= 1
+            room.drop(rtc.DisconnectReason.SIGNAL_CLOSE)
+
+
+def _make_connection(monkeypatch):
+    FakeRoom.fail_connects = 0
+    FakeRoom.fail_disconnects = False
+    FakeRoom.instances = []
+    monkeypatch.setattr(backend_api.rtc, "Room", FakeRoom)
+    monkeypatch.setattr(
+        backend_api,
+        "SharkAgent",
+        lambda agent_name, instructions, deal_board, chat_ctx=None: (
+            instructions,
+            chat_ctx,
+        ),
+    )
+    monkeypatch.setattr(backend_api, "RECONNECT_BASE_DELAY", 0.001)
+
+    room = FakeRoom()
+    room.connected = True
+    connection = backend_api.ManagedAgentConnection(
+        room=room,
+        session=FakeSession(),
+        room_name="arena-1",
+        agent_name="Mark",
+        instructions="You are Mark.",
+        ws_url="wss://example.livekit.cloud",
+        token_factory=lambda: "token",
+        deal_board=backend_api.DealBoard(room_name="arena-1"),
+    )
+    monkeypatch.setitem(
+        backend_api.ACTIVE_AGENT_CONNECTIONS, ("arena-1", "Mark"), connection
+    )
+    backend_api._watch_agent_room(connection)
+    return connection
+
+
+def test_reconnect_resumes_existing_session_with_history(monkeypatch):
+    async def run():
+        connection = _make_connection(monkeypatch)
+        session = connection.session
+        original_room = connection.room
+
+        original_room.drop(rtc.DisconnectReason.SIGNAL_CLOSE)
+        assert await connection.reconnect_task is True
+
+        assert connection.session is session
+        assert connection.room is not original_room
+        assert connection.room.isconnected()
+        assert session.closed == 1
+        [(room, (instructions, chat_ctx))] = session.started_with
+        assert room is connection.room
+        assert instructions == "You are Mark."
+        assert chat_ctx.items == ["pitch: $500k for 10%"]
+        assert connection.metrics.successes == 1
+        assert connection.metrics.last_seconds is not None
+
+    asyncio.run(run())
+
+
+def test_reconnect_retries_with_backoff_until_connected(monkeypatch):
+    async def run():
+        connection = _make_connection(monkeypatch)
+        FakeRoom.fail_connects = 2
+
+        connection.room.drop(rtc.DisconnectReason.CONNECTION_TIMEOUT)
+        assert await connection.reconnect_task is True
+
+        assert connection.metrics.attempts == 3
+        assert connection.metrics.failed_attempts == 2
+        assert connection.metrics.failed_cycles == 0
+        assert backend_api.ACTIVE_AGENT_CONNECTIONS[("arena-1", "Mark")] is connection
+
+    asyncio.run(run())
+
+
+def test_reconnect_gives_up_after_max_attempts(monkeypatch):
+    async def run():
+        connection = _make_connection(monkeypatch)
+        monkeypatch.setattr(backend_api, "RECONNECT_MAX_ATTEMPTS", 2)
+        FakeRoom.fail_connects = 5
+
+        connection.room.drop(rtc.DisconnectReason.SIGNAL_CLOSE)
+        assert await connection.reconnect_task is False
+
+        assert connection.metrics.attempts == 2
+        assert connection.metrics.failed_attempts == 2
+        assert connection.metrics.failed_cycles == 1
+        assert connection.session.started_with == []
+        assert ("arena-1", "Mark") not in backend_api.ACTIVE_AGENT_CONNECTIONS
+
+    asyncio.run(run())
+
+
+def test_failed_start_closes_session_before_retrying(monkeypatch):
+    async def run():
+        connection = _make_connection(monkeypatch)
+        connection.session.fail_starts = 1
+        FakeRoom.fail_disconnects = True
+
+        connection.room.drop(rtc.DisconnectReason.SIGNAL_CLOSE)
+        assert await connection.reconnect_task is True
+
+        # Once for the dropped room, once to undo the half-started attempt.
+        assert connection.session.closed == 2
+        assert len(connection.session.started_with) == 2
+        assert connection.metrics.failed_attempts == 1
+
+    asyncio.run(run())
+
+
+def test_drop_during_session_start_is_retried(monkeypatch):
+    async def run():
+        connection = _make_connection(monkeypatch)
+        connection.session.drop_during_start = 1
+
+        connection.room.drop(rtc.DisconnectReason.SIGNAL_CLOSE)
+        assert await connection.reconnect_task is True
+
+        assert connection.room.isconnected()
+        assert connection.metrics.attempts == 2
+        assert backend_api.ACTIVE_AGENT_CONNECTIONS[("arena-1", "Mark")] is connection
+
+    asyncio.run(run())
+
+
+def test_intentional_disconnect_does_not_reconnect(monkeypatch):
+    async def run():
+        connection = _make_connection(monkeypatch)
+
+        connection.room.drop(rtc.DisconnectReason.ROOM_DELETED)
+
+        assert connection.reconnect_task is None
+
+    asyncio.run(run())
+
+
+def test_reconnect_delay_is_immediate_then_jittered_and_capped():
+    assert backend_api._reconnect_delay(0) == 0.0
+    for attempt in range(1, 20):
+        delay = backend_api._reconnect_delay(attempt)
+        assert 0 <= delay <= backend_api.RECONNECT_MAX_DELAY
+
+
+def test_join_waits_for_reconnect_without_holding_join_lock(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "google-key")
+    monkeypatch.setattr(backend_api, "DEAL_BOARDS", {})
+
+    async def run():
+        connection = _make_connection(monkeypatch)
+        connection.room.connected = False
+        release = asyncio.Event()
+
+        async def slow_reconnect(conn):
+            await release.wait()
+            conn.room = FakeRoom()
+            conn.room.connected = True
+            return True
+
+        monkeypatch.setattr(backend_api, "_reconnect_agent", slow_reconnect)
+        join = asyncio.create_task(
+            backend_api._join_agents_manually(
+                server_url="wss://example.livekit.cloud",
+                api_key="key",
+                api_secret="secret",
+                room_name="arena-1",
+                agent_names=["Mark"],
+            )
+        )
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert not join.done()
+        assert not backend_api.AGENT_JOIN_LOCK.locked()
+
+        release.set()
+        return await join
+
+    assert asyncio.run(run()) == ["Mark"]
@@ -71,6 +71,7 @@ def test_token_with_agents_creates_room_and_connects_all(monkeypatch):
     assert fake_lkapi.room.created_rooms == ["arena-1"]
     assert len(connected_calls) == 1
     assert connected_calls[0]["room_name"] == "arena-1"
+    assert connected_calls[0]["room_created"] is True
 
 
 def test_token_with_agents_is_idempotent_when_room_exists(monkeypatch):
@@ -124,3 +125,17 @@ def test_token_with_agents_requires_credentials(monkeypatch):
 
     assert response.status_code == 500
     assert response.json()["detail"] == "LiveKit credentials not configured"
+
+
+def test_agent_connections_requires_debug_token(monkeypatch):
+    monkeypatch.setenv("DEBUG_API_TOKEN", "s3cret")
+
+    client = TestClient(backend_api.app)
+    anonymous = client.get("/agent-connections")
+    authorized = client.get(
+        "/agent-connections", headers={"Authorization": "Bearer s3cret"}
+    )
+
+    assert anonymous.status_code == 401
+    assert authorized.status_code == 200
+    assert "connections" in authorized.json()
@@ -0,0 +1,277 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+from livekit.agents import llm
+
+from backend import api as backend_api
+from backend.deal_board import DealBoard, Offer
+
+
+def test_deal_board_snapshot_tracks_pitch_and_offers():
+    board = DealBoard(room_name="arena-1")
+    assert board.update_pitch(company="Acme", ask_amount=500_000, equity_percent=10)
+    assert board.set_offer("Kevin", Offer(500_000, 20, royalty_percent=5))
+
+    assert board.version == 2
+    assert board.valuation == 5_000_000
+    assert board.snapshot() == (
+        "DEAL BOARD v2\n"
+        "Company: Acme\n"
+        "Ask: $500,000 for 10% (valuation $5,000,000)\n"
+        "Revenue: unknown\n"
+        "Offers: Kevin: $500,000 for 20% + 5% royalty"
+    )
+
+
+def test_deal_board_ignores_repeated_facts():
+    board = DealBoard(room_name="arena-1")
+    board.update_pitch(ask_amount=500_000)
+    snapshot = board.snapshot()
+
+    assert not board.update_pitch(ask_amount=500_000)
+    assert board.set_offer("Lori", Offer(100_000, 25))
+    assert not board.set_offer("Lori", Offer(100_000, 25))
+    assert board.version == 2
+    assert board.withdraw_offer("Lori")
+    assert not board.withdraw_offer("Lori")
+    assert board.version == 3
+    assert board.snapshot() is not snapshot
+
+
+class FakeRealtimeSession:
+    """Mimics Gemini Live: new items are sent, removed items are never dropped."""
+
+    def __init__(self, delay=0.0, fail_updates=0):
+        self.delay = delay
+        self.fail_updates = fail_updates
+        self.known = llm.ChatContext.empty()
+        self.sent = []
+
+    @property
+    def chat_ctx(self):
+        return self.known.copy()
+
+    async def update_chat_ctx(self, chat_ctx):
+        await asyncio.sleep(self.delay)
+        if self.fail_updates:
+            self.fail_updates -= 1
+            raise RuntimeError("realtime session is reconnecting")
+        known_ids = {item.id for item in self.known.items}
+        assert known_ids <= {item.id for item in chat_ctx.items}
+        self.sent.extend(item for item in chat_ctx.items if item.id not in known_ids)
+        self.known = chat_ctx
+
+
+def _make_sharks(monkeypatch, board, sessions):
+    monkeypatch.setattr(
+        backend_api.SharkAgent,
+        "realtime_llm_session",
+        property(lambda self: sessions[self._agent_name]),
+    )
+
+    async def fail_update_instructions(self, instructions):
+        raise AssertionError("deal board updates must not resend instructions")
+
+    monkeypatch.setattr(
+        backend_api.SharkAgent, "update_instructions", fail_update_instructions
+    )
+    sharks = {
+        name: backend_api.SharkAgent(name, f"You are {name}.", board)
+        for name in sessions
+    }
+    for shark in sharks.values():
+        board.subscribe(shark._on_deal_board_updated)
+    return sharks
+
+
+def test_shark_tool_calls_send_only_new_snapshots(monkeypatch):
+    async def run():
+        board = DealBoard(room_name="arena-1")
+        sessions = {"Kevin": FakeRealtimeSession(), "Mark": FakeRealtimeSession()}
+        sharks = _make_sharks(monkeypatch, board, sessions)
+        kevin = sharks["Kevin"]
+
+        replies = [await kevin.update_deal_board(revenue=1_200_000)]
+        await asyncio.gather(*board._publish_tasks)
+        replies.append(await kevin.update_deal_board(revenue=1_200_000))
+        replies.append(await kevin.make_offer(amount=250_000, equity_percent=15))
+        await asyncio.gather(*board._publish_tasks)
+        return replies, sessions
+
+    replies, sessions = asyncio.run(run())
+
+    assert replies == [
+        "Deal board updated.",
+        "The deal board already shows that.",
+        "Deal board updated.",
+    ]
+    for session in sessions.values():
+        # One compact snapshot per change, appended like Gemini Live does.
+        assert len(session.sent) == 2
+        assert session.known.items == session.sent
+        assert all(item.role == "user" for item in session.sent)
+        assert all(
+            item.text_content.startswith(backend_api.DEAL_BOARD_UPDATE_PREFIX)
+            for item in session.sent
+        )
+        latest = session.sent[-1].text_content
+        assert "You are" not in latest
+        assert "Revenue: $1,200,000" in latest
+        assert "Offers: Kevin: $250,000 for 15%" in latest
+
+
+def test_failed_snapshot_send_is_retried_on_next_change(monkeypatch):
+    async def run():
+        board = DealBoard(room_name="arena-1")
+        sessions = {"Kevin": FakeRealtimeSession(), "Mark": FakeRealtimeSession()}
+        sessions["Mark"].fail_updates = 1
+        sharks = _make_sharks(monkeypatch, board, sessions)
+        mark = sharks["Mark"]
+
+        board.update_pitch(company="Acme")
+        await board.publish()
+        assert sessions["Mark"].sent == []
+        assert mark._board_version == 0
+
+        await mark._on_deal_board_updated(board)
+        return sessions["Mark"]
+
+    mark_session = asyncio.run(run())
+
+    [item] = mark_session.sent
+    assert "Company: Acme" in item.text_content
+
+
+def test_shark_tool_call_does_not_wait_for_other_sharks(monkeypatch):
+    async def run():
+        board = DealBoard(room_name="arena-1")
+        sessions = {
+            "Kevin": FakeRealtimeSession(),
+            "Mark": FakeRealtimeSession(delay=10),
+            "Lori": FakeRealtimeSession(delay=10),
+        }
+        sharks = _make_sharks(monkeypatch, board, sessions)
+
+        started = time.perf_counter()
+        await sharks["Kevin"].update_deal_board(company="Acme")
+        elapsed = time.perf_counter() - started
+        for task in board._publish_tasks:
+            task.cancel()
+        return elapsed
+
+    assert asyncio.run(run()) < 1
+
+
+def test_deal_board_publish_runs_listeners_concurrently():
+    async def run():
+        board = DealBoard(room_name="arena-1")
+
+        async def slow_listener(_board):
+            await asyncio.sleep(0.1)
+
+        async def broken_listener(_board):
+            raise RuntimeError("session gone")
+
+        for _ in range(3):
+            board.subscribe(slow_listener)
+        board.subscribe(broken_listener)
+
+        started = time.perf_counter()
+        await board.publish()
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 0.25
+
+
+def test_new_room_resets_stale_deal_board_and_sharks(monkeypatch):
+    class StaleRoom:
+        def __init__(self):
+            self.disconnected = False
+
+        def isconnected(self):
+            return not self.disconnected
+
+        async def disconnect(self):
+            self.disconnected = True
+
+    class StaleSession:
+        closed = False
+
+        async def aclose(self):
+            self.closed = True
+
+    async def run():
+        stale_board = DealBoard(room_name="shark-arena")
+        stale_board.update_pitch(company="Old Co")
+        connection = backend_api.ManagedAgentConnection(
+            room=StaleRoom(),
+            session=StaleSession(),
+            room_name="shark-arena",
+            agent_name="Mark",
+            instructions="You are Mark.",
+            ws_url="wss://example.livekit.cloud",
+            token_factory=lambda: "token",
+            deal_board=stale_board,
+        )
+        monkeypatch.setattr(
+            backend_api,
+            "ACTIVE_AGENT_CONNECTIONS",
+            {("shark-arena", "Mark"): connection},
+        )
+        monkeypatch.setattr(backend_api, "DEAL_BOARDS", {"shark-arena": stale_board})
+
+        await backend_api._reset_room("shark-arena")
+        return connection
+
+    connection = asyncio.run(run())
+
+    assert backend_api.ACTIVE_AGENT_CONNECTIONS == {}
+    assert backend_api.DEAL_BOARDS == {}
+    assert connection.session.closed
+    assert connection.room.disconnected
+
+
+def test_deal_board_dropped_with_last_shark(monkeypatch):
+    board = DealBoard(room_name="arena-1")
+    connections = {
+        ("arena-1", name): backend_api.ManagedAgentConnection(
+            room=None,
+            session=None,
+            room_name="arena-1",
+            agent_name=name,
+            instructions="",
+            ws_url="",
+            token_factory=lambda: "token",
+            deal_board=board,
+        )
+        for name in ["Mark", "Kevin"]
+    }
+    monkeypatch.setattr(backend_api, "ACTIVE_AGENT_CONNECTIONS", dict(connections))
+    monkeypatch.setattr(backend_api, "DEAL_BOARDS", {"arena-1": board})
+
+    backend_api._forget_connection(connections[("arena-1", "Mark")])
+    assert backend_api.DEAL_BOARDS == {"arena-1": board}
+
+    backend_api._forget_connection(connections[("arena-1", "Kevin")])
+    assert backend_api.DEAL_BOARDS == {}
+
+
+def test_get_deal_board_endpoint(monkeypatch):
+    board = DealBoard(room_name="arena-9")
+    board.update_pitch(company="Acme")
+    monkeypatch.setitem(backend_api.DEAL_BOARDS, "arena-9", board)
+
+    monkeypatch.setenv("DEBUG_API_TOKEN", "s3cret")
+    headers = {"Authorization": "Bearer s3cret"}
+
+    client = TestClient(backend_api.app)
+    anonymous = client.get("/deal-board/arena-9")
+    response = client.get("/deal-board/arena-9", headers=headers)
+    missing = client.get("/deal-board/arena-404", headers=headers)
+
+    assert anonymous.status_code == 401
+    assert response.status_code == 200
+    assert response.json()["version"] == 1
+    assert "Company: Acme" in response.json()["snapshot"]
+    assert missing.status_code == 404
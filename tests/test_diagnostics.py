@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from backend import api as backend_api
+from backend.diagnostics import LoopLagMonitor, format_collapsed, sample_stacks
+
+
+def test_loop_lag_histogram_buckets():
+    monitor = LoopLagMonitor()
+    monitor.record(0.0005)
+    monitor.record(0.03)
+    monitor.record(10.0)
+
+    snapshot = monitor.snapshot()
+    assert snapshot["count"] == 3
+    assert snapshot["max_seconds"] == 10.0
+    assert snapshot["buckets"]["le_1ms"] == 1
+    assert snapshot["buckets"]["le_50ms"] == 1
+    assert snapshot["buckets"]["inf"] == 1
+
+
+def test_loop_lag_monitor_reports_blocked_loop(caplog):
+    async def run():
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.2)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        return monitor
+
+    with caplog.at_level("WARNING", logger="backend.diagnostics"):
+        monitor = asyncio.run(run())
+
+    assert monitor.stalls >= 1
+    assert monitor.max_seconds >= 0.15
+    assert "Event loop blocked" in caplog.text
+    assert "time.sleep(0.2)" in caplog.text
+
+
+def test_sample_stacks_collapses_target_thread():
+    stop = threading.Event()
+
+    def busy_shark_work():
+        while not stop.is_set():
+            time.sleep(0.001)
+
+    worker = threading.Thread(target=busy_shark_work, name="worker")
+    worker.start()
+    try:
+        stacks = sample_stacks(0.05, interval=0.005, thread_ids=[worker.ident])
+    finally:
+        stop.set()
+        worker.join()
+
+    profile = format_collapsed(stacks)
+    assert stacks
+    assert all(stack.startswith("worker;") for stack in stacks)
+    assert "busy_shark_work (test_diagnostics.py:" in profile
+    assert profile.splitlines()[0].rsplit(" ", 1)[1].isdigit()
+
+
+def test_debug_endpoints_disabled_without_token(monkeypatch):
+    monkeypatch.delenv("DEBUG_API_TOKEN", raising=False)
+
+    client = TestClient(backend_api.app)
+    response = client.get("/debug/profile", params={"seconds": 0.01})
+
+    assert response.status_code == 404
+
+
+def test_debug_endpoints_reject_wrong_token(monkeypatch):
+    monkeypatch.setenv("DEBUG_API_TOKEN", "s3cret")
+
+    client = TestClient(backend_api.app)
+    response = client.get(
+        "/debug/loop-lag", headers={"Authorization": "Bearer wrong"}
+    )
+
+    assert response.status_code == 401
+
+
+def test_debug_profile_returns_collapsed_stacks(monkeypatch):
+    monkeypatch.setenv("DEBUG_API_TOKEN", "s3cret")
+
+    client = TestClient(backend_api.app)
+    response = client.get(
+        "/debug/profile",
+        params={"seconds": 0.05, "interval_ms": 5},
+        headers={"Authorization": "Bearer s3cret"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack
+        assert int(count) > 0
+
+
+def test_debug_profile_rejects_concurrent_profiles(monkeypatch):
+    monkeypatch.setenv("DEBUG_API_TOKEN", "s3cret")
+
+    async def run():
+        await backend_api.PROFILE_LOCK.acquire()
+        try:
+            return await backend_api.get_profile(
+                seconds=0.01, interval_ms=5, all_threads=False
+            )
+        finally:
+            backend_api.PROFILE_LOCK.release()
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(run())
+
+    assert excinfo.value.status_code == 409